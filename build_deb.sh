@@ -34,7 +34,7 @@ Section: utils
 Priority: optional
 Architecture: all
 Depends: python3 (>= 3.8), python3-gi, gir1.2-gtk-3.0, python3-evdev, xdotool
-Recommends: wl-clipboard, xclip
+Recommends: wl-clipboard, xclip, python3-msgpack, python3-orjson, python3-xxhash
 Maintainer: WinVX <winvx@github.com>
 Description: Windows 11 style clipboard manager (Win+V)
  WinVX is a Linux native clipboard history manager,
@@ -116,7 +116,7 @@ POSTRM
 chmod 755 "$SCRIPT_DIR/$PKG_DIR/DEBIAN/postrm"
 
 # ── 6. Copy Python Source ──────────────────────
-for f in main.py clip_store.py clipboard_monitor.py clipboard_ui.py session_helper.py; do
+for f in main.py clip_store.py clipboard_monitor.py clipboard_ui.py session_helper.py single_instance.py; do
     cp "$SCRIPT_DIR/$f" "$SCRIPT_DIR/$PKG_DIR/opt/winvx/"
 done
 
@@ -1,16 +1,31 @@
 """
-clip_store.py — ClipEntry data model and JSON persistence
+clip_store.py — ClipEntry data model and history persistence
 WinVX: Windows 11 Win+V style clipboard manager
 """
 
 import json
 import os
+import sys
 import time
-import uuid
+import secrets
 import base64
-from dataclasses import dataclass, field, asdict
+import hashlib
+import queue
+import threading
+from dataclasses import dataclass, field
 from typing import Optional
 from pathlib import Path
+from gi.repository import GLib
+
+try:
+    import msgpack  # Optional: compact binary history format
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson  # Optional: native encoder, much faster than stdlib json
+except ImportError:
+    orjson = None
 
 
 # ── Data Directory ──────────────────────────────────────────
@@ -19,31 +34,104 @@ DATA_DIR = Path(os.environ.get(
     "WINVX_DATA_DIR",
     os.path.expanduser("~/.local/share/winvx")
 ))
-HISTORY_FILE = DATA_DIR / "history.json"
+LEGACY_HISTORY_FILE = DATA_DIR / "history.json"
+MSGPACK_HISTORY_FILE = DATA_DIR / "history.msgpack"
+HISTORY_FILE = MSGPACK_HISTORY_FILE if msgpack else LEGACY_HISTORY_FILE
+JOURNAL_FILE = DATA_DIR / "history.log"    # Append-only changes since the last snapshot
+COMPACTING_JOURNAL_FILE = DATA_DIR / "history.log.old"  # Journal being folded into a snapshot
 IMAGES_DIR = DATA_DIR / "images"
 
 MAX_ITEMS = 25          # Limit for non-pinned items (consistent with Win11)
 MAX_CONTENT_LEN = 4096  # Max character count for text content
+SAVE_DELAY_MS = 500     # Coalesce bursts of mutations into a single write
+COMPACT_RATIO = 4       # Rewrite the snapshot once the journal outgrows history by this factor
+DIR_FSYNC_INTERVAL = 60  # Seconds; bound how often a snapshot rename is fsync'd to disk
+
+
+# ── Serialization ────────────────────────────────────────────
+
+def _dumps(data) -> bytes:
+    """Encode history in the current HISTORY_FILE format"""
+    if msgpack:
+        return msgpack.packb(data, use_bin_type=True)
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes, path: Path):
+    """Decode history read from path (msgpack or JSON, by file suffix)"""
+    if path.suffix == ".msgpack":
+        return msgpack.unpackb(raw, raw=False)
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _image_digest(image_bytes: bytes) -> bytes:
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+def _dump_line(op: dict) -> bytes:
+    """Encode one journal record as a single JSON line"""
+    if orjson:
+        return orjson.dumps(op) + b"\n"
+    return json.dumps(op, ensure_ascii=False).encode("utf-8") + b"\n"
 
 
 # ── ClipEntry Dataclass ───────────────────────────────────────
 
-@dataclass
+# Slotted on Python 3.10+: no per-instance __dict__, faster attribute access
+@dataclass(**({"slots": True} if sys.version_info >= (3, 10) else {}))
 class ClipEntry:
     """A single clipboard history record"""
-    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    id: str = field(default_factory=lambda: secrets.token_hex(6))
     content_type: str = "text"          # text | image | html
     content: str = ""                   # Text content / Image filename
     preview: str = ""                   # Preview text (truncated)
     timestamp: float = field(default_factory=time.time)
     pinned: bool = False
+    # Lowercased preview + content for search (not persisted)
+    _search_blob: str = field(default="", init=False, repr=False, compare=False)
+    # BLAKE2b digest of the image file, set once the image index knows it (not persisted)
+    _digest: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    # Row text for the popup list, built on first display (not persisted)
+    _display_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._search_blob = f"{self.preview}\x1f{self.content}".lower()
+
+    @property
+    def display_text(self) -> str:
+        """Text shown in the list row: max 3 lines / 200 chars (cached)"""
+        if self._display_text is None:
+            # One bounded split: at most 4 parts, the 4th only signals "more lines"
+            parts = self.content[:200].split("\n", 3)
+            display_text = "\n".join(parts[:3])
+            if len(self.content) > 200 or len(parts) > 3:
+                display_text += "…"
+            self._display_text = display_text
+        return self._display_text
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "content_type": self.content_type,
+            "content": self.content,
+            "preview": self.preview,
+            "timestamp": self.timestamp,
+            "pinned": self.pinned,
+        }
 
     @classmethod
     def from_dict(cls, d: dict) -> "ClipEntry":
-        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+        get = d.get
+        return cls(
+            id=get("id") or secrets.token_hex(6),
+            content_type=get("content_type", "text"),
+            content=get("content", ""),
+            preview=get("preview", ""),
+            timestamp=get("timestamp") or time.time(),
+            pinned=get("pinned", False),
+        )
 
 
 # ── ClipStore Management ───────────────────────────────────────
@@ -54,48 +142,88 @@ class ClipStore:
     def __init__(self, max_items: int = MAX_ITEMS):
         self.max_items = max_items
         self._entries: list[ClipEntry] = []
+        # Lookup indices, kept in sync with _entries
+        self._by_id: dict[str, ClipEntry] = {}
+        self._by_key: dict[tuple[str, str], ClipEntry] = {}
+        # Image digest → entry; built lazily on the first add_image()
+        self._image_digests: Optional[dict[bytes, ClipEntry]] = None
+        # Sorted view returned by `entries`; reset to None on every mutation
+        self._entries_view_cache: Optional[list[ClipEntry]] = None
+        self._dirty = False
+        self._save_timer_id = None
+        self._journal_ops = 0  # Records appended to JOURNAL_FILE since the last snapshot
+        # Snapshot writes run on a worker thread; _lock orders journal appends
+        # against snapshot + journal rotation, _write_lock serializes writers
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._last_dir_fsync = 0.0
         self._ensure_dirs()
         self._load()
+        threading.Thread(target=self._save_loop, daemon=True).start()
 
     # ── Public API ────────────────────────────────────────────────
 
     @property
     def entries(self) -> list[ClipEntry]:
-        """Return all entries (pinned first, reverse chronological order)"""
-        pinned = [e for e in self._entries if e.pinned]
-        normal = [e for e in self._entries if not e.pinned]
-        pinned.sort(key=lambda e: e.timestamp, reverse=True)
-        normal.sort(key=lambda e: e.timestamp, reverse=True)
-        return pinned + normal
+        """Return all entries (pinned first, reverse chronological order)
+
+        The list is cached between mutations; callers must not modify it.
+        """
+        if self._entries_view_cache is None:
+            pinned = [e for e in self._entries if e.pinned]
+            normal = [e for e in self._entries if not e.pinned]
+            pinned.sort(key=lambda e: e.timestamp, reverse=True)
+            normal.sort(key=lambda e: e.timestamp, reverse=True)
+            self._entries_view_cache = pinned + normal
+        return self._entries_view_cache
 
     def add(self, content_type: str, content: str, preview: str = "") -> Optional[ClipEntry]:
         """Add new entry, auto-deduplicate and limit. Returns new entry or None."""
-        if not content or not content.strip():
+        if not content or content.isspace():
             return None
 
+        if content_type == "text":
+            content = content[:MAX_CONTENT_LEN]
+
         # Deduplication: if content exists, move to top (update timestamp)
-        for existing in self._entries:
-            if existing.content_type == content_type and existing.content == content:
-                existing.timestamp = time.time()
-                self._save()
-                return existing
+        existing = self._by_key.get((content_type, content))
+        if existing is not None:
+            existing.timestamp = time.time()
+            self._entries_view_cache = None
+            self._append_op({"op": "touch", "id": existing.id,
+                             "timestamp": existing.timestamp})
+            return existing
 
         entry = ClipEntry(
             content_type=content_type,
-            content=content[:MAX_CONTENT_LEN] if content_type == "text" else content,
+            content=content,
             preview=preview or self._make_preview(content_type, content),
             timestamp=time.time(),
         )
         self._entries.append(entry)
+        self._index(entry)
+        self._append_op({"op": "add", "entry": entry.to_dict()})
         self._enforce_limit()
-        self._save()
         return entry
 
     def add_image(self, image_bytes: bytes, fmt: str = "png") -> Optional[ClipEntry]:
         """Save image to disk and add entry"""
         if not image_bytes:
             return None
-        filename = f"{uuid.uuid4().hex[:12]}.{fmt}"
+
+        # Deduplication before touching the disk: same image just moves to top
+        digest = _image_digest(image_bytes)
+        digests = self._get_image_digests()
+        existing = digests.get(digest)
+        if existing is not None:
+            existing.timestamp = time.time()
+            self._entries_view_cache = None
+            self._append_op({"op": "touch", "id": existing.id,
+                             "timestamp": existing.timestamp})
+            return existing
+
+        filename = f"{secrets.token_hex(6)}.{fmt}"
         filepath = IMAGES_DIR / filename
         filepath.write_bytes(image_bytes)
 
@@ -105,57 +233,65 @@ class ClipStore:
             preview=f"[Image {len(image_bytes)//1024}KB]",
             timestamp=time.time(),
         )
+        entry._digest = digest
+        digests[digest] = entry
         self._entries.append(entry)
+        self._index(entry)
+        self._append_op({"op": "add", "entry": entry.to_dict()})
         self._enforce_limit()
-        self._save()
         return entry
 
     def delete(self, entry_id: str) -> bool:
         """Delete entry by id"""
-        for i, e in enumerate(self._entries):
-            if e.id == entry_id:
-                removed = self._entries.pop(i)
-                # Clean up image file
-                if removed.content_type == "image":
-                    img_path = IMAGES_DIR / removed.content
-                    if img_path.exists():
-                        img_path.unlink()
-                self._save()
-                return True
-        return False
+        removed = self._by_id.get(entry_id)
+        if removed is None:
+            return False
+        self._remove(removed)
+        # Clean up image file
+        if removed.content_type == "image":
+            (IMAGES_DIR / removed.content).unlink(missing_ok=True)
+        self._append_op({"op": "del", "id": entry_id})
+        return True
 
     def toggle_pin(self, entry_id: str) -> bool:
         """Toggle pinned status"""
-        for e in self._entries:
-            if e.id == entry_id:
-                e.pinned = not e.pinned
-                self._save()
-                return True
-        return False
+        e = self._by_id.get(entry_id)
+        if e is None:
+            return False
+        e.pinned = not e.pinned
+        self._entries_view_cache = None
+        self._append_op({"op": "pin", "id": entry_id, "pinned": e.pinned})
+        return True
 
     def clear(self, keep_pinned: bool = True):
         """Clear history (keep pinned items by default)"""
-        if keep_pinned:
-            removed = [e for e in self._entries if not e.pinned]
-            self._entries = [e for e in self._entries if e.pinned]
-        else:
-            removed = list(self._entries)
-            self._entries.clear()
+        removed = self._clear_entries(keep_pinned)
 
         # 清理图片文件
-        for e in removed:
-            if e.content_type == "image":
-                img_path = IMAGES_DIR / e.content
-                if img_path.exists():
-                    img_path.unlink()
-        self._save()
-
-    def search(self, query: str) -> list[ClipEntry]:
-        """Search entries (fuzzy match)"""
+        # (missing files are fine: the memory change must still be journaled below)
+        for name in {e.content for e in removed if e.content_type == "image"}:
+            (IMAGES_DIR / name).unlink(missing_ok=True)
+        self._append_op({"op": "clear", "keep_pinned": keep_pinned})
+
+    def flush(self):
+        """Compact pending journal changes into the snapshot (called on exit)"""
+        if self._save_timer_id is not None:
+            GLib.source_remove(self._save_timer_id)
+            self._save_timer_id = None
+        if self._dirty or self._journal_ops:
+            self._save()
+
+    def search(self, query: str, within: Optional[list[ClipEntry]] = None) -> list[ClipEntry]:
+        """Search entries (fuzzy match)
+
+        within: previous results to narrow instead of scanning all entries
+        (valid when query extends the query that produced them).
+        """
         if not query:
             return self.entries
         q = query.lower()
-        results = [e for e in self.entries if q in e.preview.lower() or q in e.content.lower()]
+        results = [e for e in (self.entries if within is None else within)
+                   if q in e._search_blob]
         return results
 
     def get_image_path(self, entry: ClipEntry) -> Optional[Path]:
@@ -171,42 +307,233 @@ class ClipStore:
         if content_type == "image":
             return "[Image]"
         # Text preview: first line, truncated to 80 chars
-        line = content.split("\n")[0].strip()
+        # (only look at a bounded head, never split the whole content)
+        head = content[:256]
+        nl = head.find("\n")
+        line = (head[:nl] if nl >= 0 else head).strip()
         return line[:80] + ("…" if len(line) > 80 else "")
 
     def _enforce_limit(self):
         """Limit non-pinned entries"""
-        normal = [e for e in self._entries if not e.pinned]
+        normal = [e for e in self.entries if not e.pinned]
         if len(normal) > self.max_items:
-            # Sort by time ascending, delete oldest
-            normal.sort(key=lambda e: e.timestamp)
-            to_remove = normal[:len(normal) - self.max_items]
+            # The view is already newest-first, so the oldest are at the tail
+            to_remove = normal[self.max_items:]
             for e in to_remove:
-                self._entries.remove(e)
+                self._remove(e)
                 if e.content_type == "image":
-                    img_path = IMAGES_DIR / e.content
-                    if img_path.exists():
-                        img_path.unlink()
+                    (IMAGES_DIR / e.content).unlink(missing_ok=True)
+                self._append_op({"op": "del", "id": e.id})
+
+    def _index(self, entry: ClipEntry):
+        self._entries_view_cache = None
+        self._by_id[entry.id] = entry
+        self._by_key[(entry.content_type, entry.content)] = entry
+
+    def _unindex(self, entry: ClipEntry):
+        self._entries_view_cache = None
+        self._by_id.pop(entry.id, None)
+        if self._by_key.get((entry.content_type, entry.content)) is entry:
+            del self._by_key[(entry.content_type, entry.content)]
+        if entry._digest is not None and self._image_digests is not None:
+            self._image_digests.pop(entry._digest, None)
+
+    def _get_image_digests(self) -> dict[bytes, ClipEntry]:
+        """Image digest index, hashing each existing image file once on first use"""
+        if self._image_digests is None:
+            self._image_digests = {}
+            for e in self._entries:
+                if e.content_type != "image":
+                    continue
+                try:
+                    e._digest = _image_digest((IMAGES_DIR / e.content).read_bytes())
+                except OSError:
+                    continue
+                self._image_digests[e._digest] = e
+        return self._image_digests
+
+    def _remove(self, entry: ClipEntry):
+        self._entries.remove(entry)
+        self._unindex(entry)
+
+    def _clear_entries(self, keep_pinned: bool) -> list[ClipEntry]:
+        """Drop entries from memory and return the removed ones"""
+        if keep_pinned:
+            removed = [e for e in self._entries if not e.pinned]
+            self._entries = [e for e in self._entries if e.pinned]
+        else:
+            removed = list(self._entries)
+            self._entries.clear()
+        for e in removed:
+            self._unindex(e)
+        return removed
+
+    def _rebuild_index(self):
+        self._entries_view_cache = None
+        self._by_id = {}
+        self._by_key = {}
+        self._image_digests = None
+        for e in self._entries:
+            self._index(e)
 
     def _ensure_dirs(self):
         DATA_DIR.mkdir(parents=True, exist_ok=True)
         IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
     def _load(self):
-        if not HISTORY_FILE.exists():
-            self._entries = []
-            return
+        """Load the snapshot, replay the journal on top, then compact"""
+        self._entries = []
+        path = HISTORY_FILE
+        migrate = False
+        if msgpack is None and MSGPACK_HISTORY_FILE.exists():
+            # Can't read it, but never overwrite it: it comes back once msgpack does
+            print(f"[WinVX] ⚠ {MSGPACK_HISTORY_FILE} needs python3-msgpack, which is not installed")
+            print(f"[WinVX]   Using {LEGACY_HISTORY_FILE} instead; install msgpack to restore that history")
+        if not path.exists() and path != LEGACY_HISTORY_FILE and LEGACY_HISTORY_FILE.exists():
+            # One-time migration from the old history.json
+            path = LEGACY_HISTORY_FILE
+            migrate = True
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                data = _loads(raw, path)
+                self._entries = [ClipEntry.from_dict(d) for d in data]
+            except (ValueError, KeyError, TypeError):
+                # JSON and msgpack decode errors are all ValueError subclasses
+                self._entries = []
+                migrate = False
+        self._rebuild_index()
+        self._replay_journal()
+
+        if migrate or self._journal_ops:
+            self._save()
+        if migrate and HISTORY_FILE.exists():
+            LEGACY_HISTORY_FILE.unlink(missing_ok=True)
+
+    def _replay_journal(self):
+        """Apply records appended since the last snapshot (all ops are idempotent)"""
+        lines = []
+        # A journal left mid-compaction is older than the live one
+        for path in (COMPACTING_JOURNAL_FILE, JOURNAL_FILE):
+            try:
+                with open(path, "rb") as f:
+                    lines.extend(f.readlines())
+            except OSError:
+                pass
+        for line in lines:
+            try:
+                op = orjson.loads(line) if orjson else json.loads(line)
+                self._apply_op(op)
+            except (ValueError, KeyError, TypeError):
+                continue  # Torn or unknown record (e.g. crash mid-append)
+            self._journal_ops += 1
+
+    def _apply_op(self, op: dict):
+        kind = op["op"]
+        if kind == "add":
+            entry = ClipEntry.from_dict(op["entry"])
+            old = self._by_id.get(entry.id)
+            if old is not None:
+                self._remove(old)
+            self._entries.append(entry)
+            self._index(entry)
+        elif kind == "del":
+            old = self._by_id.get(op["id"])
+            if old is not None:
+                self._remove(old)
+        elif kind == "touch":
+            e = self._by_id.get(op["id"])
+            if e is not None:
+                e.timestamp = op["timestamp"]
+                self._entries_view_cache = None
+        elif kind == "pin":
+            e = self._by_id.get(op["id"])
+            if e is not None:
+                e.pinned = op["pinned"]
+                self._entries_view_cache = None
+        elif kind == "clear":
+            self._clear_entries(op["keep_pinned"])
+
+    def _append_op(self, op: dict):
+        """Record one mutation as a small journal append instead of a full rewrite"""
         try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._entries = [ClipEntry.from_dict(d) for d in data]
-        except (json.JSONDecodeError, KeyError, TypeError):
-            self._entries = []
+            with self._lock:
+                with open(JOURNAL_FILE, "ab") as f:
+                    f.write(_dump_line(op))
+                # Counted under the same lock as the write: a rotation resets it
+                self._journal_ops += 1
+                journal_ops = self._journal_ops
+        except OSError as e:
+            print(f"[WinVX] Failed to append history journal: {e}")
+            self._schedule_save()
+            return
+        if journal_ops > COMPACT_RATIO * max(len(self._entries), self.max_items):
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """Mark history dirty and write it once after SAVE_DELAY_MS"""
+        self._dirty = True
+        if self._save_timer_id is None:
+            self._save_timer_id = GLib.timeout_add(SAVE_DELAY_MS, self._flush_save)
+
+    def _flush_save(self):
+        self._save_timer_id = None
+        if self._dirty:
+            try:
+                self._save_queue.put_nowait(True)
+            except queue.Full:
+                pass  # A save is already pending and will pick up this change
+        return False  # GLib.timeout_add does not repeat
+
+    def _save_loop(self):
+        """Worker thread: write snapshots requested by _flush_save"""
+        while True:
+            self._save_queue.get()
+            self._save()
 
     def _save(self):
+        with self._write_lock:
+            with self._lock:
+                self._dirty = False
+                # list() copies atomically; entries are encoded outside the main thread
+                data = [e.to_dict() for e in list(self._entries)]
+                # Rotate the journal: records appended from now on stay in JOURNAL_FILE.
+                # If an earlier compaction failed, keep both journals (replay is idempotent).
+                if not COMPACTING_JOURNAL_FILE.exists():
+                    try:
+                        os.replace(JOURNAL_FILE, COMPACTING_JOURNAL_FILE)
+                        self._journal_ops = 0
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"[WinVX] Failed to rotate history journal: {e}")
+            tmp_path = HISTORY_FILE.with_suffix(".tmp")
+            try:
+                # Write to a temp file and rename, so a crash never leaves a truncated history
+                with open(tmp_path, "wb") as f:
+                    f.write(_dumps(data))
+                    f.flush()
+                    os.fsync(f.fileno())  # Data on disk before the rename can be
+                os.replace(tmp_path, HISTORY_FILE)
+                if COMPACTING_JOURNAL_FILE.exists():
+                    # The snapshot now covers everything in the rotated journal, but
+                    # that journal may only go once the rename itself is durable
+                    self._fsync_data_dir(force=True)
+                    COMPACTING_JOURNAL_FILE.unlink(missing_ok=True)
+                else:
+                    self._fsync_data_dir()
+            except OSError as e:
+                print(f"[WinVX] Failed to save history: {e}")
+
+    def _fsync_data_dir(self, force: bool = False):
+        """Persist the snapshot rename, at most once per DIR_FSYNC_INTERVAL unless forced"""
+        now = time.monotonic()
+        if not force and now - self._last_dir_fsync < DIR_FSYNC_INTERVAL:
+            return
+        self._last_dir_fsync = now
+        fd = os.open(DATA_DIR, os.O_RDONLY)
         try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump([e.to_dict() for e in self._entries], f,
-                          ensure_ascii=False, indent=2)
-        except OSError as e:
-            print(f"[WinVX] Failed to save history: {e}")
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -11,10 +11,35 @@ from gi.repository import Gtk, Gdk, GLib, GdkPixbuf
 
 import io
 import os
+import logging
+import time
+import codecs
+import fcntl
+import hashlib
 import subprocess
-import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
-from clip_store import ClipStore, ClipEntry
+from clip_store import ClipStore, ClipEntry, MAX_CONTENT_LEN
+
+try:
+    import xxhash  # Optional: XXH3 is several times faster than BLAKE2 on MB-sized buffers
+except ImportError:
+    xxhash = None
+
+log = logging.getLogger("winvx")
+
+# Keep at most this much of one wl-paste payload (well above MAX_CONTENT_LEN chars of UTF-8)
+MAX_WATCH_BYTES = 64 * 1024
+WL_SETTLE_MS = 10  # A payload is complete once the wl-paste pipe stays quiet this long
+WL_PIPE_SIZE = 1 << 20  # Ask the kernel for a 1 MiB pipe so a payload arrives in one read
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)  # Constant exposed only on Python 3.10+
+
+
+def _fast_digest(data) -> bytes:
+    """Change-detection digest (not cryptographic): XXH3-128 if available, else BLAKE2b"""
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
 
 
 class ClipboardMonitor:
@@ -25,11 +50,21 @@ class ClipboardMonitor:
         self.store = store
         self.on_change = on_change  # Callback: triggered when a new entry is added
         self._last_text = None
-        self._last_image_hash = None
+        self._last_wl_digest = None   # Digest of the last raw wl-paste payload
+        self._last_image_hash = None  # Pixel fingerprint of the last encoded image (worker only)
         self._ignore_next = False   # Used to ignore owner-change triggered by ourselves during paste
         self._wayland = wayland
         self._wl_watch_proc = None
+        self._wl_copy_proc = None    # Foreground wl-copy currently serving our clipboard content
+        self._wl_running = False
+        self._wl_watch_src = None    # GLib IO watch on the wl-paste stdout pipe
+        self._wl_settle_id = None    # Pending timeout that completes the current payload
+        self._wl_respawn_id = None   # Pending restart of wl-paste --watch after it exited
+        self._wl_chunks: list[bytes] = []
+        self._wl_total = 0
         self._skip_change_until = 0  # Timestamp: skip wl-paste change detection before this time
+        # PNG encoding of large screenshots runs here so the main loop stays responsive
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="winvx-png")
 
         # Get system clipboard
         self.clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
@@ -48,6 +83,15 @@ class ClipboardMonitor:
     def stop(self):
         """Stop monitoring (called on exit)"""
         self._wl_running = False
+        if self._wl_watch_src is not None:
+            GLib.source_remove(self._wl_watch_src)
+            self._wl_watch_src = None
+        if self._wl_settle_id is not None:
+            GLib.source_remove(self._wl_settle_id)
+            self._wl_settle_id = None
+        if self._wl_respawn_id is not None:
+            GLib.source_remove(self._wl_respawn_id)
+            self._wl_respawn_id = None
         if self._wl_watch_proc:
             try:
                 self._wl_watch_proc.terminate()
@@ -58,6 +102,7 @@ class ClipboardMonitor:
                 except Exception:
                     pass
             self._wl_watch_proc = None
+        self._io_executor.shutdown(wait=False)
 
     def set_ignore_next(self):
         """Called before paste operation to ignore the next owner-change"""
@@ -68,11 +113,11 @@ class ClipboardMonitor:
         self._ignore_next = True
         # Wayland: skip wl-paste change detection for the next 2 seconds
         # (Avoid list refresh triggered by our own set content)
-        import time as _time
-        self._skip_change_until = _time.time() + 2.0
+        self._skip_change_until = time.time() + 2.0
         # Remember the content we are pasting to prevent duplicate processing if detected by wl-paste
         if entry.content_type in ("text", "html"):
             self._last_text = entry.content
+            self._last_wl_digest = None
 
         if self._wayland:
             # Wayland: use only wl-copy (do not set GTK clipboard at same time, causes conflict and empty content)
@@ -99,38 +144,16 @@ class ClipboardMonitor:
         try:
             if entry.content_type == "text" or entry.content_type == "html":
                 content = entry.content
-                print(f"[WinVX] DEBUG: Preparing to write to clipboard: '{content[:50]}...' (len={len(content)})")
+                log.debug("Preparing to write to clipboard: '%.50s...' (len=%d)", content, len(content))
                 # Pass content via stdin pipe (wl-copy stays running to serve clipboard, cannot wait)
-                proc = subprocess.Popen(
-                    ["wl-copy"],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
+                proc = self._spawn_wl_copy([], subprocess.PIPE)
                 proc.stdin.write(content.encode("utf-8"))
                 proc.stdin.close()
-                # Do not wait for wl-copy to exit; it runs in background until another app takes over
-                # Verification: read back clipboard content
-                try:
-                    verify = subprocess.run(
-                        ["wl-paste", "--no-newline"],
-                        capture_output=True, timeout=1
-                    )
-                    actual = verify.stdout.decode("utf-8", errors="replace")[:50]
-                    print(f"[WinVX] DEBUG: Verify clipboard: '{actual}'")
-                except Exception:
-                    pass
             elif entry.content_type == "image":
                 img_path = self.store.get_image_path(entry)
                 if img_path:
                     with open(img_path, "rb") as f:
-                        proc = subprocess.Popen(
-                            ["wl-copy", "--type", "image/png"],
-                            stdin=f,
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.PIPE
-                        )
-                        proc.wait(timeout=2)
+                        self._spawn_wl_copy(["--type", "image/png"], f)
         except FileNotFoundError:
             print("[WinVX] ✗ wl-copy not installed, falling back to GTK")
             self._paste_entry_gtk(entry)
@@ -138,6 +161,27 @@ class ClipboardMonitor:
             print(f"[WinVX] wl-copy failed, falling back to GTK: {e}")
             self._paste_entry_gtk(entry)
 
+    def _spawn_wl_copy(self, args: list, stdin):
+        """Start a foreground wl-copy child for new content and retire the previous one
+
+        --foreground skips wl-copy's own daemonizing fork, and keeping the child
+        lets us reap it instead of leaving a detached process per paste.
+        It runs in its own session so the clipboard outlives WinVX.
+        """
+        proc = subprocess.Popen(
+            ["wl-copy", "--foreground", *args],
+            stdin=stdin,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        old, self._wl_copy_proc = self._wl_copy_proc, proc
+        if old and old.poll() is None:
+            # Don't kill it: it keeps serving the selection until the new child has
+            # taken over, then exits on its own. Just reap it when it does
+            GLib.child_watch_add(GLib.PRIORITY_DEFAULT, old.pid, lambda *a: None)
+        return proc
+
     # ── wl-paste Background Monitoring (Wayland) ──────────────────
 
     def _start_wl_paste_watch(self):
@@ -152,93 +196,113 @@ class ClipboardMonitor:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL
             )
-            import threading
+            fd = self._wl_watch_proc.stdout.fileno()
+            os.set_blocking(fd, False)
+            try:
+                fcntl.fcntl(fd, F_SETPIPE_SZ, WL_PIPE_SIZE)
+            except OSError:
+                pass  # Older kernel or above /proc/sys/fs/pipe-max-size: keep the default
             self._wl_running = True
-            self._wl_thread = threading.Thread(
-                target=self._wl_paste_watch_loop, daemon=True
+            # The main loop reads the pipe directly: no reader thread, no idle_add handoff
+            self._wl_watch_src = GLib.io_add_watch(
+                fd, GLib.PRIORITY_DEFAULT,
+                GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+                self._on_wl_io
             )
-            self._wl_thread.start()
             print("[WinVX] ✓ wl-paste --watch event monitoring started")
         except FileNotFoundError:
             print("[WinVX] ⚠ wl-paste not installed, background monitoring unavailable")
             print("[WinVX]   Please install: sudo apt install wl-clipboard")
         except Exception as e:
             print(f"[WinVX] ⚠ wl-paste monitoring failed to start: {e}")
+        return False
 
-    def _wl_paste_watch_loop(self):
-        """Background thread: read wl-paste --watch output, triggered only on change"""
-        import time as _time
-        import select
-        proc = self._wl_watch_proc
-        if not proc or not proc.stdout:
-            return
+    def _respawn_wl_paste_watch(self):
+        self._wl_respawn_id = None
+        return self._start_wl_paste_watch()
 
-        fd = proc.stdout.fileno()
-
-        while getattr(self, '_wl_running', False):
-            try:
-                # Wait for data to be readable (non-blocking, low CPU usage)
-                readable, _, _ = select.select([fd], [], [], 1.0)
-                if not readable:
-                    continue
-
-                # New data — clipboard has changed
-                # Short sleep to collect full content (wl-paste may write in multiple chunks)
-                _time.sleep(0.05)
-
-                # Read all available data
-                data = b""
-                while True:
-                    r, _, _ = select.select([fd], [], [], 0.01)
-                    if not r:
-                        break
-                    chunk = proc.stdout.read1(4096)  # type: ignore
-                    if not chunk:
-                        break
-                    data += chunk
-
-                if not data:
-                    # Process may have exited
-                    if proc.poll() is not None:
-                        _time.sleep(1)
-                        if getattr(self, '_wl_running', False):
-                            try:
-                                self._wl_watch_proc = subprocess.Popen(
-                                    ["wl-paste", "--no-newline", "--watch", "cat"],
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.DEVNULL
-                                )
-                                proc = self._wl_watch_proc
-                            except Exception:
-                                _time.sleep(5)
-                    continue
-
-                # Decode text
+    def _on_wl_io(self, fd, condition):
+        """wl-paste pipe readable: drain until EAGAIN"""
+        eof = False
+        if condition & GLib.IO_IN:
+            while True:
                 try:
-                    text = data.decode("utf-8").strip()
-                except UnicodeDecodeError:
-                    continue
-
-                if not text:
-                    continue
-
-                # Skip the short window after paste operation
-                if _time.time() < self._skip_change_until:
-                    continue
-
-                if text != self._last_text:
-                    self._last_text = text
-                    GLib.idle_add(self._handle_wl_paste_text, text)
-
-            except Exception:
-                _time.sleep(1)
+                    chunk = os.read(fd, WL_PIPE_SIZE)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    eof = True
+                    break
+                # Past the cap keep draining (so the tail isn't read as a new change) but drop it
+                if self._wl_total < MAX_WATCH_BYTES:
+                    self._wl_chunks.append(chunk)
+                self._wl_total += len(chunk)
+
+        if eof or condition & (GLib.IO_HUP | GLib.IO_ERR):
+            # wl-paste exited: flush what we have and respawn it shortly
+            self._finish_wl_payload()
+            self._wl_watch_src = None
+            proc = self._wl_watch_proc
+            if proc:
+                proc.stdout.close()
+                proc.poll()
+            if self._wl_running:
+                self._wl_respawn_id = GLib.timeout_add_seconds(1, self._respawn_wl_paste_watch)
+            return False
+
+        # cat may write one payload in several chunks; complete it once the pipe goes quiet
+        if self._wl_total:
+            if self._wl_settle_id is not None:
+                GLib.source_remove(self._wl_settle_id)
+            self._wl_settle_id = GLib.timeout_add(WL_SETTLE_MS, self._finish_wl_payload)
+        return True
+
+    def _finish_wl_payload(self):
+        """Decode one complete wl-paste payload and record it"""
+        if self._wl_settle_id is not None:
+            GLib.source_remove(self._wl_settle_id)
+            self._wl_settle_id = None
+        data = b"".join(self._wl_chunks)
+        truncated = self._wl_total > MAX_WATCH_BYTES
+        self._wl_chunks = []
+        self._wl_total = 0
+        if not data:
+            return False
+
+        # Byte-identical to the previous payload: skip decoding and comparing text
+        digest = _fast_digest(data)
+        if digest == self._last_wl_digest:
+            return False
+        self._last_wl_digest = digest
+
+        # Decode text
+        try:
+            if truncated:
+                # Drop a multi-byte character cut in half by the byte cap
+                text = codecs.getincrementaldecoder("utf-8")().decode(data[:MAX_WATCH_BYTES])
+            else:
+                text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+        text = text.strip()[:MAX_CONTENT_LEN]
+
+        if not text:
+            return False
+
+        # Skip the short window after paste operation
+        if time.time() < self._skip_change_until:
+            return False
+
+        if text != self._last_text:
+            self._last_text = text
+            self._handle_wl_paste_text(text)
+        return False  # GLib.timeout_add does not repeat
 
     def _handle_wl_paste_text(self, text):
         """Handle text captured by wl-paste in main thread"""
         entry = self.store.add("text", text)
         if entry and self.on_change:
             self.on_change(entry)
-        return False  # GLib.idle_add does not repeat
 
     # ── Internal Methods (GTK Channel) ─────────────────────────────
 
@@ -255,28 +319,56 @@ class ClipboardMonitor:
         try:
             # Try reading text
             text = self.clipboard.wait_for_text()
-            if text and text != self._last_text:
-                self._last_text = text
-                entry = self.store.add("text", text)
-                if entry and self.on_change:
-                    self.on_change(entry)
+            if text is not None:
+                # Text clipboard (changed or not): no need to probe for an image
+                text = text[:MAX_CONTENT_LEN]
+                if text and text != self._last_text:
+                    self._last_text = text
+                    entry = self.store.add("text", text)
+                    if entry and self.on_change:
+                        self.on_change(entry)
                 return False
 
-            # Try reading image
+            # Try reading image (check the offered targets before transferring pixels)
+            if not self.clipboard.wait_is_image_available():
+                return False
             pixbuf = self.clipboard.wait_for_image()
             if pixbuf:
-                # Convert to PNG bytes
-                success, buf = pixbuf.save_to_bufferv("png", [], [])
-                if success:
-                    img_hash = hash(buf)
-                    if img_hash != self._last_image_hash:
-                        self._last_image_hash = img_hash
-                        entry = self.store.add_image(buf)
-                        if entry and self.on_change:
-                            self.on_change(entry)
+                # Fingerprint and PNG-encode off the main thread (both are O(image size))
+                self._io_executor.submit(self._encode_png, pixbuf)
 
         except Exception as e:
-            print(f"[WinVX] Failed to read clipboard: {e}")
-            traceback.print_exc()
+            # Full traceback only when debugging (WINVX_DEBUG)
+            log.warning("Failed to read clipboard: %s", e,
+                        exc_info=log.isEnabledFor(logging.DEBUG))
 
         return False  # GLib.timeout_add does not repeat
+
+    def _encode_png(self, pixbuf):
+        """Worker thread: PNG-encode pixbuf if its pixels are new, then hand the bytes back"""
+        img_hash = self._pixbuf_fingerprint(pixbuf)
+        if img_hash == self._last_image_hash:
+            return  # Same pixels as last time: skip the PNG encode entirely
+        try:
+            success, buf = pixbuf.save_to_bufferv("png", [], [])
+        except Exception as e:
+            log.warning("Failed to encode clipboard image: %s", e,
+                        exc_info=log.isEnabledFor(logging.DEBUG))
+            return  # Hash not recorded: the next owner-change retries
+        if success:
+            self._last_image_hash = img_hash
+            GLib.idle_add(self._on_png_encoded, buf)
+
+    def _on_png_encoded(self, buf: bytes):
+        """Main loop: store the encoded image (ClipStore is not thread-safe)"""
+        entry = self.store.add_image(buf)
+        if entry and self.on_change:
+            self.on_change(entry)
+        return False
+
+    @staticmethod
+    def _pixbuf_fingerprint(pixbuf) -> tuple:
+        """Identity of a pixbuf: geometry plus a digest of the raw pixel bytes"""
+        pixels = pixbuf.read_pixel_bytes().get_data()
+        return (pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride(),
+                pixbuf.get_has_alpha(), _fast_digest(pixels))
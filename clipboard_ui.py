@@ -11,7 +11,10 @@ from gi.repository import Gtk, Gdk, GLib, GdkPixbuf, Pango
 import time
 import os
 import math
+import datetime
 import cairo
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Callable
 from clip_store import ClipStore, ClipEntry, IMAGES_DIR
 
@@ -77,6 +80,10 @@ CSS = """
     background: transparent;
     padding: 2px 8px;
 }
+#winvx-list row {
+    background: transparent;
+    padding: 0;
+}
 
 /* ── Single Record ── */
 .clip-item {
@@ -162,12 +169,46 @@ CSS = """
 }
 """
 
+_css_provider: Optional[Gtk.CssProvider] = None  # Parsed once, shared by all popups
+
+
+def _install_css():
+    """Parse CSS and attach it to the default screen (first call only)"""
+    global _css_provider
+    if _css_provider is not None:
+        return
+    _css_provider = Gtk.CssProvider()
+    _css_provider.load_from_data(CSS.encode("utf-8"))
+    Gtk.StyleContext.add_provider_for_screen(
+        Gdk.Screen.get_default(),
+        _css_provider,
+        Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+    )
+
+
+class ClipRow(Gtk.ListBoxRow):
+    """List row bound to a single record"""
+
+    def __init__(self, entry: ClipEntry):
+        super().__init__()
+        self.entry = entry
+        self.pinned = entry.pinned  # Pin state the row was rendered with
+        self.item_ctx: Optional[Gtk.StyleContext] = None  # Style context of the item box
+        self.time_label: Optional[Gtk.Label] = None
+        self.time_checked = 0.0  # When time_label was last recomputed
+        self.set_can_focus(False)  # Keyboard focus stays in the search box
+
 
 class ClipboardPopup(Gtk.Window):
     """Win11 style clipboard popup"""
 
     WINDOW_WIDTH = 380
     WINDOW_HEIGHT = 520
+    SEARCH_DELAY_MS = 80
+    THUMB_WIDTH = 200
+    THUMB_HEIGHT = 80
+    THUMB_CACHE_SIZE = 64  # Decoded thumbnails kept in memory (pinned images can pile up)
+    TIME_LABEL_TTL = 30  # Seconds a relative time label is reused before recomputing
 
     def __init__(self, store: ClipStore, on_paste: Optional[Callable] = None,
                  wayland: bool = False):
@@ -176,8 +217,22 @@ class ClipboardPopup(Gtk.Window):
         self.on_paste = on_paste
         self._selected_index = -1
         self._visible_entries: list[ClipEntry] = []
+        self._visible_rows: list[ClipRow] = []
+        self._rows: dict[str, ClipRow] = {}       # entry.id → row
+        self._rows_source: Optional[list] = None  # store.entries view the rows were built from
+        self._match_ids: Optional[set] = None     # ids passing the search filter (None = all)
+        self._query = ""                          # Search entry text, updated on "changed"
+        self._last_count: Optional[int] = None    # Count shown in the footer (-1 = blank)
+        self._search_timer = 0                    # Pending debounced search source id
+        self._last_query = ""                     # Lowercased query behind _last_results
+        self._last_results: list[ClipEntry] = []
+        self._has_focus = False
+        self._focus_timer = 0                     # Fallback focus grab, cancelled by focus-in
         self._pasting = False  # Pasting flag to avoid focus-out interference
         self._wayland = wayland
+        # entry.id → decoded thumbnail, least recently used first
+        self._thumb_cache: OrderedDict[str, GdkPixbuf.Pixbuf] = OrderedDict()
+        self._thumb_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="winvx-thumb")
 
         self._setup_window()
         self._apply_css()
@@ -206,33 +261,46 @@ class ClipboardPopup(Gtk.Window):
         self.set_app_paintable(True)
 
         # Manually draw window background (rounded dark corners + border)
+        self._bg_surface = None     # Pre-rendered rounded background
+        self._bg_size = None        # (width, height) the background was rendered for
         self.connect("draw", self._on_draw)
 
         # Auto-hide on focus-out
+        self.connect("focus-in-event", self._on_focus_in)
         self.connect("focus-out-event", self._on_focus_out)
         self.connect("key-press-event", self._on_key_press)
         self.connect("delete-event", lambda w, e: self.hide() or True)
 
     def _apply_css(self):
-        provider = Gtk.CssProvider()
-        provider.load_from_data(CSS.encode("utf-8"))
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        _install_css()
 
     def _on_draw(self, widget, cr):
         """Manually draw window background: dark rounded rectangle + subtle border"""
         w = widget.get_allocated_width()
         h = widget.get_allocated_height()
-        r = 12  # Corner radius
 
-        # Clear first (full transparency)
+        # Background is rendered offscreen once per window size, then blitted
+        if self._bg_size != (w, h):
+            self._bg_surface = self._render_background(cr.get_target(), w, h)
+            self._bg_size = (w, h)
+
+        # SOURCE replaces everything, including the transparent corners
         cr.set_operator(cairo.OPERATOR_SOURCE)
-        cr.set_source_rgba(0, 0, 0, 0)
+        cr.set_source_surface(self._bg_surface, 0, 0)
         cr.paint()
 
+        # Switch back to OVER mode to let child widgets draw normally
+        cr.set_operator(cairo.OPERATOR_OVER)
+        return False  # Continue propagation to let child widgets draw
+
+    @staticmethod
+    def _render_background(target, w: int, h: int):
+        """Render the rounded background into a surface compatible with target"""
+        surface = target.create_similar(cairo.CONTENT_COLOR_ALPHA, w, h)
+        cr = cairo.Context(surface)
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        r = 12  # Corner radius
+
         # Draw rounded rectangle path
         cr.new_path()
         cr.arc(r, r, r, math.pi, 1.5 * math.pi)           # Top left
@@ -249,10 +317,7 @@ class ClipboardPopup(Gtk.Window):
         cr.set_source_rgba(0.3, 0.3, 0.3, 0.6)  # Subtle gray border
         cr.set_line_width(1)
         cr.stroke()
-
-        # Switch back to OVER mode to let child widgets draw normally
-        cr.set_operator(cairo.OPERATOR_OVER)
-        return False  # Continue propagation to let child widgets draw
+        return surface
 
     # ── Build UI ──────────────────────────────────────────────────
 
@@ -284,8 +349,16 @@ class ClipboardPopup(Gtk.Window):
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scroll.set_vexpand(True)
 
-        self.list_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        self.list_box = Gtk.ListBox()
         self.list_box.set_name("winvx-list")
+        self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.list_box.set_filter_func(self._row_filter)
+        self.list_box.connect("row-activated", self._on_row_activated)
+
+        empty = Gtk.Label(label="No clipboard records yet")
+        empty.get_style_context().add_class("empty-label")
+        empty.show()
+        self.list_box.set_placeholder(empty)
         scroll.add(self.list_box)
         main_box.pack_start(scroll, True, True, 0)
 
@@ -306,8 +379,8 @@ class ClipboardPopup(Gtk.Window):
 
         main_box.pack_start(footer, False, False, 0)
 
-        self.show_all()
-        self.hide()  # Hidden by default
+        # Mark children visible without realizing/mapping the (hidden) window
+        main_box.show_all()
 
     # ── Show/Hide ─────────────────────────────────────────────────
 
@@ -319,7 +392,7 @@ class ClipboardPopup(Gtk.Window):
 
     def popup(self):
         """Show window, follow mouse position"""
-        self._refresh_list()
+        self._refresh_list(force=True)
         self.search_entry.set_text("")
         self._selected_index = -1
 
@@ -339,7 +412,8 @@ class ClipboardPopup(Gtk.Window):
                             geom.y + geom.height - self.WINDOW_HEIGHT))
         self.move(x, y)
 
-        self.show_all()
+        self.show()  # Children are already visible; new rows are shown as they are built
+        self._has_focus = False
 
         # Forcefully grab focus (multiple ways to ensure success)
         self.present_with_time(Gdk.CURRENT_TIME)
@@ -347,13 +421,21 @@ class ClipboardPopup(Gtk.Window):
             self.get_window().focus(Gdk.CURRENT_TIME)
         self.search_entry.grab_focus()
 
-        # Delay again to grab focus (some WMs need a frame)
-        GLib.timeout_add(50, self._force_focus)
-        GLib.timeout_add(150, self._force_focus)
+        # Retry once if focus-in hasn't arrived yet (some WMs need a frame)
+        if not self._has_focus and not self._focus_timer:
+            self._focus_timer = GLib.timeout_add(80, self._force_focus)
+
+    def _on_focus_in(self, widget, event):
+        self._has_focus = True
+        if self._focus_timer:
+            GLib.source_remove(self._focus_timer)
+            self._focus_timer = 0
+        return False
 
     def _force_focus(self):
         """Force grab focus (fallback)"""
-        if self.get_visible():
+        self._focus_timer = 0
+        if self.get_visible() and not self._has_focus:
             try:
                 self.present_with_time(Gdk.CURRENT_TIME)
                 win = self.get_window()
@@ -366,40 +448,84 @@ class ClipboardPopup(Gtk.Window):
 
     # ── List Refresh ──────────────────────────────────────────────
 
-    def _refresh_list(self, query: str = ""):
-        """Re-render item list"""
-        # Clear
-        for child in self.list_box.get_children():
-            self.list_box.remove(child)
-
-        if query:
-            entries = self.store.search(query)
+    def _refresh_list(self, query: str = "", force: bool = False):
+        """Sync rows with the store, then apply the search filter"""
+        # Nothing to render while hidden: popup() forces a refresh, and a changed
+        # store is detected there by the identity of the cached entries view
+        if not force and not self.get_visible():
+            return
+        if self._rows_source is not self.store.entries:
+            self._rebuild_all_rows()
+        now = time.time()
+        for row in self._rows.values():
+            self._update_time_label(row, now)
+        self._apply_filter(query)
+
+    def _rebuild_all_rows(self):
+        """Re-sync rows with store entries (only when they change)
+
+        Rows are cached by entry id: surviving entries keep their widgets and are
+        only re-ordered; new entries (or ones whose pin state flipped) get a new row.
+        """
+        entries = self.store.entries
+        old_rows = self._rows
+        # Batch child-notify signals from the remove/add burst into one emission
+        self.list_box.freeze_child_notify()
+        try:
+            for child in self.list_box.get_children():
+                self.list_box.remove(child)  # Cached rows stay alive via old_rows
+
+            self._rows = {}
+            for entry in entries:
+                row = old_rows.get(entry.id)
+                if row is None or row.pinned != entry.pinned:
+                    row = ClipRow(entry)
+                    row.add(self._create_item_widget(entry, row))
+                    row.show_all()
+                else:
+                    row.time_checked = 0.0  # Timestamp may have been bumped by a re-copy
+                self.list_box.add(row)
+                self._rows[entry.id] = row
+        finally:
+            self.list_box.thaw_child_notify()
+        self._rows_source = entries
+        self._last_query = ""  # Cached search results refer to the old entries
+
+        # Drop thumbnails of entries that left the store (evicted/cleared)
+        if self._thumb_cache:
+            for eid in [k for k in self._thumb_cache if k not in self._rows]:
+                del self._thumb_cache[eid]
+
+    def _apply_filter(self, query: str):
+        """Hide non-matching rows without re-creating widgets"""
+        if self._selected_index >= 0:
+            self._visible_rows[self._selected_index].item_ctx.remove_class("selected")
+            self._selected_index = -1
+
+        # Typing extends the query: narrow the previous results instead of rescanning
+        q = query.lower()
+        if self._last_query and q.startswith(self._last_query):
+            entries = self.store.search(query, within=self._last_results)
         else:
-            entries = self.store.entries
+            entries = self.store.search(query)
+        self._last_query, self._last_results = q, entries
 
-        self._visible_entries = entries
+        self._match_ids = {e.id for e in entries} if query else None
+        self.list_box.invalidate_filter()
 
-        if not entries:
-            empty = Gtk.Label(label="No clipboard records yet")
-            empty.get_style_context().add_class("empty-label")
-            self.list_box.pack_start(empty, True, True, 0)
-            self.count_label.set_text("")
-        else:
-            for i, entry in enumerate(entries):
-                item = self._create_item_widget(entry, i)
-                self.list_box.pack_start(item, False, False, 0)
-            total = len(self.store.entries)
-            self.count_label.set_text(f"{total} items")
+        self._visible_entries = entries
+        self._visible_rows = [self._rows[e.id] for e in entries]
+        # Touch the label only when its text changes (set_text queues a relayout)
+        count = len(self.store.entries) if entries else -1
+        if count != self._last_count:
+            self._last_count = count
+            self.count_label.set_text(f"{count} items" if count >= 0 else "")
 
-        self.list_box.show_all()
+    def _row_filter(self, row: ClipRow) -> bool:
+        return self._match_ids is None or row.entry.id in self._match_ids
 
-    def _create_item_widget(self, entry: ClipEntry, index: int) -> Gtk.Widget:
+    def _create_item_widget(self, entry: ClipEntry, row: ClipRow) -> Gtk.Widget:
         """Create widget for a single record"""
-        # Outer event box (clickable)
-        event_box = Gtk.EventBox()
-        event_box.connect("button-press-event",
-                          lambda w, e, ent=entry: self._on_item_click(ent))
-
         item_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         ctx = item_box.get_style_context()
         ctx.add_class("clip-item")
@@ -407,58 +533,43 @@ class ClipboardPopup(Gtk.Window):
             ctx.add_class("pinned")
 
         # Save reference for keyboard navigation
-        item_box._entry = entry
-        item_box._index = index
+        row.item_ctx = ctx
 
         # ── Left Content ──
         content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
         content_box.set_hexpand(True)
 
         if entry.content_type == "image":
-            # Image preview
-            img_path = self.store.get_image_path(entry)
-            if img_path:
-                try:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                        str(img_path), 200, 80, True)
+            # Image preview (decoded thumbnails are cached; misses decode off-thread)
+            pixbuf = self._thumb_cache.get(entry.id)
+            if pixbuf is not None:
+                self._thumb_cache.move_to_end(entry.id)
+            img_path = self.store.get_image_path(entry) if pixbuf is None else None
+            if pixbuf is not None or img_path:
+                if pixbuf is not None:
                     image = Gtk.Image.new_from_pixbuf(pixbuf)
-                    image.get_style_context().add_class("clip-image-preview")
-                    image.set_halign(Gtk.Align.START)
-                    content_box.pack_start(image, False, False, 0)
-                except Exception:
-                    label = Gtk.Label(label=entry.preview)
-                    label.get_style_context().add_class("clip-preview")
-                    label.set_halign(Gtk.Align.START)
-                    content_box.pack_start(label, False, False, 0)
+                else:
+                    image = Gtk.Image()
+                    image.set_size_request(-1, self.THUMB_HEIGHT)  # Reserve space until decoded
+                    self._thumb_pool.submit(self._decode_thumb, entry, image, img_path)
+                image.get_style_context().add_class("clip-image-preview")
+                image.set_halign(Gtk.Align.START)
+                content_box.pack_start(image, False, False, 0)
             else:
-                label = Gtk.Label(label=entry.preview)
-                label.get_style_context().add_class("clip-preview")
-                label.set_halign(Gtk.Align.START)
-                content_box.pack_start(label, False, False, 0)
+                content_box.pack_start(self._make_preview_label(entry), False, False, 0)
         else:
             # Text preview (max 3 lines)
-            preview_text = entry.content[:200]
-            lines = preview_text.split("\n")[:3]
-            display_text = "\n".join(lines)
-            if len(entry.content) > 200 or len(preview_text.split("\n")) > 3:
-                display_text += "…"
-
-            label = Gtk.Label(label=display_text)
+            # Properties set at construction: one GObject init instead of a setter per property
+            label = Gtk.Label(label=entry.display_text, halign=Gtk.Align.START, xalign=0,
+                              wrap=True, wrap_mode=Pango.WrapMode.CHAR, max_width_chars=40,
+                              lines=3, ellipsize=Pango.EllipsizeMode.END)
             label.get_style_context().add_class("clip-preview")
-            label.set_halign(Gtk.Align.START)
-            label.set_xalign(0)
-            label.set_line_wrap(True)
-            label.set_line_wrap_mode(Pango.WrapMode.CHAR)
-            label.set_max_width_chars(40)
-            label.set_lines(3)
-            label.set_ellipsize(Pango.EllipsizeMode.END)
             content_box.pack_start(label, False, False, 0)
 
-        # Time label
-        time_str = self._format_time(entry.timestamp)
-        meta = Gtk.Label(label=time_str)
+        # Time label (text filled in by _update_time_label)
+        meta = Gtk.Label(halign=Gtk.Align.START)
         meta.get_style_context().add_class("clip-meta")
-        meta.set_halign(Gtk.Align.START)
+        row.time_label = meta
         content_box.pack_start(meta, False, False, 0)
 
         item_box.pack_start(content_box, True, True, 0)
@@ -468,27 +579,23 @@ class ClipboardPopup(Gtk.Window):
         btn_box.set_valign(Gtk.Align.CENTER)
 
         # Pin button
-        pin_btn = Gtk.Button(label="📌")
-        pin_btn.get_style_context().add_class("clip-action-btn")
+        pin_btn = Gtk.Button(label="📌", tooltip_text="Unpin" if entry.pinned else "Pin")
+        pin_ctx = pin_btn.get_style_context()
+        pin_ctx.add_class("clip-action-btn")
         if entry.pinned:
-            pin_btn.get_style_context().add_class("clip-pin-active")
-        pin_btn.set_tooltip_text("Pin" if not entry.pinned else "Unpin")
-        pin_btn.connect("clicked",
-                        lambda w, eid=entry.id: self._on_pin(eid))
+            pin_ctx.add_class("clip-pin-active")
+        pin_btn.connect("clicked", self._on_pin_clicked, row)
         btn_box.pack_start(pin_btn, False, False, 0)
 
         # Delete button
-        del_btn = Gtk.Button(label="✕")
+        del_btn = Gtk.Button(label="✕", tooltip_text="Delete")
         del_btn.get_style_context().add_class("clip-action-btn")
-        del_btn.set_tooltip_text("Delete")
-        del_btn.connect("clicked",
-                        lambda w, eid=entry.id: self._on_delete(eid))
+        del_btn.connect("clicked", self._on_delete_clicked, row)
         btn_box.pack_start(del_btn, False, False, 0)
 
         item_box.pack_end(btn_box, False, False, 0)
 
-        event_box.add(item_box)
-        return event_box
+        return item_box
 
     # ── Event Handling ────────────────────────────────────────────
 
@@ -501,27 +608,50 @@ class ClipboardPopup(Gtk.Window):
         # Reset flag after paste is complete
         GLib.timeout_add(100, self._reset_pasting)
 
+    def _on_row_activated(self, list_box, row: ClipRow):
+        """Click row → Paste"""
+        self._on_item_click(row.entry)
+
+    def _on_pin_clicked(self, button, row: ClipRow):
+        self._on_pin(row.entry.id)
+
+    def _on_delete_clicked(self, button, row: ClipRow):
+        self._on_delete(row.entry.id)
+
     def _on_pin(self, entry_id: str):
         self.store.toggle_pin(entry_id)
-        query = self.search_entry.get_text()
-        self._refresh_list(query)
+        self._refresh_list(self._query)
 
     def _on_delete(self, entry_id: str):
         self.store.delete(entry_id)
-        query = self.search_entry.get_text()
-        self._refresh_list(query)
+        self._thumb_cache.pop(entry_id, None)
+        self._refresh_list(self._query)
 
     def _on_clear_all(self, widget):
         self.store.clear(keep_pinned=True)
-        query = self.search_entry.get_text()
-        self._refresh_list(query)
+        self._refresh_list(self._query)
 
     def _on_search_changed(self, entry):
-        query = entry.get_text()
-        self._refresh_list(query)
+        # Coalesce rapid keystrokes into a single filter pass
+        self._query = entry.get_text()
+        if self._search_timer:
+            GLib.source_remove(self._search_timer)
+        self._search_timer = GLib.timeout_add(self.SEARCH_DELAY_MS, self._do_search)
+
+    def _do_search(self):
+        self._search_timer = 0
+        self._refresh_list(self._query)
+        return False
+
+    def _flush_search(self):
+        """Apply a pending search immediately (before navigating/pasting)"""
+        if self._search_timer:
+            GLib.source_remove(self._search_timer)
+            self._do_search()
 
     def _on_focus_out(self, widget, event):
         """Hide on focus-out"""
+        self._has_focus = False
         if self._pasting:
             return False  # Do not hide while pasting
         # Delay slightly to avoid accidental trigger when clicking buttons
@@ -545,6 +675,15 @@ class ClipboardPopup(Gtk.Window):
             self.hide()
             return True
 
+        # Super+V while the popup has focus closes it, like the global hotkey
+        super_mask = Gdk.ModifierType.MOD4_MASK | Gdk.ModifierType.SUPER_MASK
+        if key in (Gdk.KEY_v, Gdk.KEY_V) and event.state & super_mask:
+            self.hide()
+            return True
+
+        if key in (Gdk.KEY_Return, Gdk.KEY_KP_Enter, Gdk.KEY_Down, Gdk.KEY_Up):
+            self._flush_search()
+
         if key == Gdk.KEY_Return or key == Gdk.KEY_KP_Enter:
             if 0 <= self._selected_index < len(self._visible_entries):
                 self._on_item_click(self._visible_entries[self._selected_index])
@@ -572,30 +711,70 @@ class ClipboardPopup(Gtk.Window):
 
         self._selected_index = new
 
-        # Update visual highlight
-        children = self.list_box.get_children()
-        for i, child in enumerate(children):
-            # child is EventBox, item_box inside
-            inner = child.get_children()[0] if isinstance(child, Gtk.EventBox) else child
-            ctx = inner.get_style_context()
-            if i == new:
-                ctx.add_class("selected")
-                # Scroll to visible area
-                adj = self.list_box.get_parent().get_vadjustment()
-                alloc = child.get_allocation()
-                if alloc.y + alloc.height > adj.get_value() + adj.get_page_size():
-                    adj.set_value(alloc.y + alloc.height - adj.get_page_size())
-                elif alloc.y < adj.get_value():
-                    adj.set_value(alloc.y)
-            else:
-                ctx.remove_class("selected")
+        # Update visual highlight: only the previous and the new row change
+        if old >= 0:
+            self._visible_rows[old].item_ctx.remove_class("selected")
+        row = self._visible_rows[new]
+        row.item_ctx.add_class("selected")
+
+        # Scroll to visible area
+        adj = self.list_box.get_parent().get_vadjustment()
+        alloc = row.get_allocation()
+        if alloc.y + alloc.height > adj.get_value() + adj.get_page_size():
+            adj.set_value(alloc.y + alloc.height - adj.get_page_size())
+        elif alloc.y < adj.get_value():
+            adj.set_value(alloc.y)
 
     # ── Utility Methods ───────────────────────────────────────────
 
+    def _decode_thumb(self, entry: ClipEntry, image: Gtk.Image, path):
+        """Worker thread: decode a scaled thumbnail, then hand it to the main loop"""
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                str(path), self.THUMB_WIDTH, self.THUMB_HEIGHT, True)
+        except Exception:
+            pixbuf = None
+        GLib.idle_add(self._on_thumb_decoded, entry, image, pixbuf)
+
+    def _on_thumb_decoded(self, entry: ClipEntry, image: Gtk.Image,
+                          pixbuf: Optional[GdkPixbuf.Pixbuf]):
+        if pixbuf is not None:
+            if entry.id in self._rows:
+                self._thumb_cache[entry.id] = pixbuf
+                if len(self._thumb_cache) > self.THUMB_CACHE_SIZE:
+                    self._thumb_cache.popitem(last=False)
+            image.set_size_request(-1, -1)
+            image.set_from_pixbuf(pixbuf)
+        else:
+            # Unreadable image file: fall back to the text preview
+            box = image.get_parent()
+            if box is not None:
+                label = self._make_preview_label(entry)
+                box.pack_start(label, False, False, 0)
+                box.reorder_child(label, 0)
+                label.show()
+                image.destroy()
+        return False
+
+    @staticmethod
+    def _make_preview_label(entry: ClipEntry) -> Gtk.Label:
+        label = Gtk.Label(label=entry.preview, halign=Gtk.Align.START)
+        label.get_style_context().add_class("clip-preview")
+        return label
+
+    def _update_time_label(self, row: ClipRow, now: float):
+        """Refresh a row's relative time, at most once per TIME_LABEL_TTL"""
+        if now - row.time_checked < self.TIME_LABEL_TTL:
+            return
+        row.time_checked = now
+        text = self._format_time(row.entry.timestamp, now)
+        if text != row.time_label.get_text():
+            row.time_label.set_text(text)
+
     @staticmethod
-    def _format_time(ts: float) -> str:
+    def _format_time(ts: float, now: Optional[float] = None) -> str:
         """Format time as relative description"""
-        diff = time.time() - ts
+        diff = (now or time.time()) - ts
         if diff < 60:
             return "Just now"
         elif diff < 3600:
@@ -605,11 +784,8 @@ class ClipboardPopup(Gtk.Window):
         elif diff < 604800:
             return f"{int(diff // 86400)} days ago"
         else:
-            import datetime
             return datetime.datetime.fromtimestamp(ts).strftime("%m-%d %H:%M")
 
     def refresh(self):
         """External call: refresh list (when new items added)"""
-        if self.get_visible():
-            query = self.search_entry.get_text()
-            self._refresh_list(query)
+        self._refresh_list(self._query)
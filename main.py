@@ -11,6 +11,7 @@ Usage:
 """
 
 import os
+import sys
 
 # Wayland: Force GTK to use XWayland backend to make window.move() work
 # (GNOME Wayland completely ignores client-side window positioning requests)
@@ -18,18 +19,31 @@ import os
 if os.environ.get("XDG_SESSION_TYPE") == "wayland":
     os.environ.setdefault("GDK_BACKEND", "x11")
 
+# --toggle fast path: signal the running instance before importing GTK/argparse
+if __name__ == "__main__" and sys.argv[1:] == ["--toggle"]:
+    from single_instance import send_toggle
+    if send_toggle():
+        sys.exit(0)
+
 import gi
 gi.require_version("Gtk", "3.0")
 gi.require_version("Gdk", "3.0")
-from gi.repository import Gtk, Gdk, GLib
+from gi.repository import Gtk, Gdk, GLib, Gio
+try:
+    gi.require_version("GdkX11", "3.0")
+    from gi.repository import GdkX11  # Makes X11 GdkWindows expose get_xid()
+except (ValueError, ImportError):
+    pass
 
-import os
-import sys
 import signal
 import socket
+import shutil
+import struct
 import argparse
+import logging
 import subprocess
 import threading
+import time
 import ctypes
 import ctypes.util
 from pathlib import Path
@@ -38,59 +52,93 @@ from clip_store import ClipStore
 from clipboard_monitor import ClipboardMonitor
 from clipboard_ui import ClipboardPopup
 from session_helper import is_wayland, is_x11, get_session_type, has_ydotool
+from single_instance import SOCKET_ADDR, CRED_BUFSIZE, is_running, send_toggle, sender_uid
 
+log = logging.getLogger("winvx")
 
-# ── Single Instance Control ───────────────────────────────────
+MAIN_PATH = os.path.abspath(__file__)  # Used in the --toggle command shown/registered
+DESKTOP = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
 
-SOCKET_PATH = "/tmp/winvx.sock"
+# posix_spawn file actions for the xdotool paste fallback
+_DEVNULL_STDOUT_STDERR = [
+    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+    (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+]
 
 
-def is_running() -> bool:
-    """Check if an instance is already running"""
-    try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(SOCKET_PATH)
-        sock.close()
-        return True
-    except (ConnectionRefusedError, FileNotFoundError, OSError):
-        return False
-
-
-def send_toggle():
-    """Send toggle signal to a running instance"""
-    try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(SOCKET_PATH)
-        sock.sendall(b"toggle")
-        sock.close()
-        return True
-    except Exception:
-        return False
+# ── X11 Global Hotkey (Pure ctypes) ───────────────────────────
 
+XK_v = 0x0076
+XK_Control_L = 0xffe3
+
+# Mod4Mask = Super key (usually 1<<6 = 64); CapsLock (LockMask) and NumLock (Mod2Mask)
+# must be grabbed too, or Super+V is missed while they are on
+_Mod4Mask, _LockMask, _Mod2Mask = 1 << 6, 1 << 1, 1 << 4
+HOTKEY_MOD_COMBOS = (
+    _Mod4Mask,
+    _Mod4Mask | _LockMask,
+    _Mod4Mask | _Mod2Mask,
+    _Mod4Mask | _LockMask | _Mod2Mask,
+)
+
+
+class XKeyEvent(ctypes.Structure):
+    """Xlib XKeyEvent (type is the first member of every XEvent variant)"""
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("window", ctypes.c_ulong),
+        ("root", ctypes.c_ulong),
+        ("subwindow", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("x_root", ctypes.c_int),
+        ("y_root", ctypes.c_int),
+        ("state", ctypes.c_uint),
+        ("keycode", ctypes.c_uint),
+    ]
+
+
+# GdkFilterReturn (*GdkFilterFunc)(GdkXEvent *xevent, GdkEvent *event, gpointer data)
+GdkFilterFunc = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p)
+GDK_FILTER_CONTINUE, GDK_FILTER_REMOVE = 0, 2
 
-# ── X11 Global Hotkey (Pure ctypes) ───────────────────────────
 
 class X11HotkeyListener:
     """Use ctypes to directly call X11 API to register global hotkeys
-    
+
+    The grab lives on GDK's own X connection: hotkey events reach us through a
+    GDK event filter on the root window, dispatched by the GTK main loop.
+
     Note: If the desktop environment (GNOME/KDE) has already claimed the Super key,
     XGrabKey may fail to intercept Super+V. In this case, you need to use
     the desktop environment's own hotkey settings to bind the --toggle command.
     """
 
+    REPEAT_GAP = 0.15  # Presses closer than this to the previous one are auto-repeat
+
     def __init__(self, callback):
         self.callback = callback
-        self._running = False
-        self._thread = None
+        self._filter = None               # GdkFilterFunc; must stay referenced while installed
+        self._hotkey = 0                  # Keycode of 'v' once grabbed
+        self._key_down = False            # Hotkey currently held (for auto-repeat filtering)
+        self._last_press = 0.0            # time.monotonic() of the last hotkey KeyPress
+        self._keycodes: dict[int, int] = {}  # keysym → keycode
 
         # 加载 X11 库
         x11_path = ctypes.util.find_library("X11")
         if not x11_path:
             raise RuntimeError("找不到 libX11")
         self.xlib = ctypes.cdll.LoadLibrary(x11_path)
+        gdk_path = ctypes.util.find_library("gdk-3")
+        if not gdk_path:
+            raise RuntimeError("找不到 libgdk-3")
+        self.gdk = ctypes.cdll.LoadLibrary(gdk_path)
 
         # 设置返回类型
-        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
         self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
         self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
         self.xlib.XKeysymToKeycode.restype = ctypes.c_int
@@ -99,99 +147,115 @@ class X11HotkeyListener:
             ctypes.c_void_p, ctypes.c_int, ctypes.c_uint,
             ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_int
         ]
-        self.xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
         self.xlib.XFlush.argtypes = [ctypes.c_void_p]
-        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.gdk.gdk_x11_get_default_xdisplay.restype = ctypes.c_void_p
+        self.gdk.gdk_get_default_root_window.restype = ctypes.c_void_p
+        self.gdk.gdk_window_add_filter.argtypes = [ctypes.c_void_p, GdkFilterFunc, ctypes.c_void_p]
+        self.gdk.gdk_window_remove_filter.argtypes = [ctypes.c_void_p, GdkFilterFunc, ctypes.c_void_p]
 
-        # 打开独立的 Display 连接 (线程安全)
-        self.display = self.xlib.XOpenDisplay(None)
+        # Share GDK's Display connection (GDK also enables detectable auto-repeat on it)
+        self.display = self.gdk.gdk_x11_get_default_xdisplay()
         if not self.display:
             raise RuntimeError("无法打开 X Display")
 
         self.root = self.xlib.XDefaultRootWindow(self.display)
+        self._gdk_root = self.gdk.gdk_get_default_root_window()
 
     def start(self):
-        """Start listening for global hotkeys (in background thread)"""
+        """Start listening for global hotkeys (events dispatched by the GTK main loop)"""
         # Get keycode for 'v'
-        keycode = self.xlib.XKeysymToKeycode(self.display, 0x0076)  # XK_v = 0x76
+        keycode = self.keycode(XK_v)
         if not keycode:
             print("[WinVX] ✗ Failed to get keycode for 'v'")
             return False
 
-        # Mod4Mask = Super key (usually 1<<6 = 64)
-        Mod4Mask = (1 << 6)
-        LockMask = (1 << 1)    # CapsLock
-        Mod2Mask = (1 << 4)    # NumLock
-
-        # Register XGrabKey (need to handle CapsLock/NumLock combinations)
-        modifiers_combos = [
-            Mod4Mask,
-            Mod4Mask | LockMask,
-            Mod4Mask | Mod2Mask,
-            Mod4Mask | LockMask | Mod2Mask,
-        ]
-
-        grabbed = False
-        for mod in modifiers_combos:
-            result = self.xlib.XGrabKey(
+        # Register XGrabKey (need to handle CapsLock/NumLock combinations).
+        # Errors are trapped: an untrapped BadAccess would abort GDK
+        Gdk.error_trap_push()
+        for mod in HOTKEY_MOD_COMBOS:
+            self.xlib.XGrabKey(
                 self.display,
                 keycode,
                 mod,
                 self.root,
-                True,   # owner_events
+                False,  # owner_events: report to root even when our popup has focus
                 1,      # GrabModeAsync
                 1,      # GrabModeAsync
             )
-            if result == 0:  # BadAccess and other errors
-                pass
-            else:
-                grabbed = True
-
-        self.xlib.XFlush(self.display)
-
-        if not grabbed:
+        if Gdk.error_trap_pop():  # Syncs; nonzero = BadAccess and other errors
             return False
 
-        self._running = True
-        self._thread = threading.Thread(target=self._listen_loop, daemon=True)
-        self._thread.start()
+        self._hotkey = keycode
+        self._filter = GdkFilterFunc(self._on_root_event)
+        self.gdk.gdk_window_add_filter(self._gdk_root, self._filter, None)
         return True
 
-    def _listen_loop(self):
-        """X11 event loop (runs in background thread)"""
-        # XEvent structure large enough to hold all event types
-        event_buf = ctypes.create_string_buffer(256)
-
-        while self._running:
-            try:
-                self.xlib.XNextEvent(self.display, event_buf)
-                # event.type is the first field of the structure (int)
-                event_type = ctypes.c_int.from_buffer_copy(event_buf).value
-                if event_type == 2:  # KeyPress
-                    GLib.idle_add(self.callback)
-            except Exception:
-                break
+    def keycode(self, keysym: int) -> int:
+        """Keycode for keysym on this display (cached)"""
+        code = self._keycodes.get(keysym)
+        if code is None:
+            code = self._keycodes[keysym] = self.xlib.XKeysymToKeycode(self.display, keysym)
+        return code
+
+    def _on_root_event(self, xevent, gdk_event, data):
+        """GDK filter for root window X events (main thread)"""
+        event = XKeyEvent.from_address(xevent)
+        event_type = event.type
+        if event_type not in (2, 3) or event.keycode != self._hotkey:
+            return GDK_FILTER_CONTINUE
+        if event_type == 2:  # KeyPress
+            if not event.state & _Mod4Mask:
+                return GDK_FILTER_CONTINUE  # Plain 'v' with the root window focused
+            # Holding Super+V must toggle once: with detectable auto-repeat the
+            # key stays down; without it, release/press pairs come back to back
+            now = time.monotonic()
+            if not self._key_down and now - self._last_press >= self.REPEAT_GAP:
+                try:
+                    self.callback()
+                except Exception as e:
+                    print(f"[WinVX] Hotkey callback failed: {e}")
+            self._key_down = True
+            self._last_press = now
+        else:  # KeyRelease
+            self._key_down = False
+        return GDK_FILTER_REMOVE
 
     def stop(self):
-        self._running = False
+        if self._filter is not None:
+            self.gdk.gdk_window_remove_filter(self._gdk_root, self._filter, None)
+            self._filter = None
 
 
 class WinVXApp:
     """WinVX Main Application Class"""
 
+    REFRESH_DELAY_MS = 50  # Clipboard changes within this window share one refresh
+    PASTE_CHECK_MS = 40    # First paste focus check; doubles until the target app has focus
+    PASTE_MAX_CHECKS = 5   # Paste anyway after this many checks (~1.2 s in total)
+    # After the popup's focus-out, give the WM this long before the first focus check
+    PASTE_SETTLE_MS = 30
+
     def __init__(self, max_items: int = 25):
         self.store = ClipStore(max_items=max_items)
         self._session_type = get_session_type()
 
+        self._refresh_timer = 0  # Pending debounced popup refresh
+        self._quitting = False
+
         # Create UI first, then Monitor (to ensure popup exists before callbacks)
         self.popup = ClipboardPopup(self.store, on_paste=self._on_paste,
                                     wayland=is_wayland())
         self.monitor = ClipboardMonitor(self.store, on_change=self._on_clip_change,
                                         wayland=is_wayland())
 
+        self._paste_timer = 0  # Watchdog for a paste waiting on the popup's focus-out
+        self._paste_attempt = 0
+        self.popup.connect("focus-out-event", self._on_popup_focus_out)
+
         self._hotkey_listener = None
         self._setup_socket_server()
         self._setup_hotkey()
+        self._setup_paste_backend()
 
     # ── Global Hotkeys ────────────────────────────────────────────
 
@@ -232,10 +296,9 @@ class WinVXApp:
     def _on_hotkey(self):
         """Hotkey callback (in main thread)"""
         self.popup.toggle()
-        return False  # GLib.idle_add does not repeat
 
     def _print_manual_setup(self):
-        me = os.path.abspath(__file__)
+        me = MAIN_PATH
         print("[WinVX]")
         print("[WinVX] Please set hotkey using one of these methods:")
         print("[WinVX]")
@@ -250,46 +313,146 @@ class WinVXApp:
 
     def _setup_socket_server(self):
         """Start Unix Socket service to receive toggle commands"""
-        if os.path.exists(SOCKET_PATH):
-            os.unlink(SOCKET_PATH)
-
-        self._server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self._server_sock.bind(SOCKET_PATH)
-        self._server_sock.listen(1)
-        self._server_sock.setblocking(False)
-
-        GLib.io_add_watch(
+        # Datagrams: each toggle is one whole message, no connection to accept
+        self._server_sock = socket.socket(socket.AF_UNIX,
+                                          socket.SOCK_DGRAM | socket.SOCK_NONBLOCK)
+        # Have the kernel attach each sender's uid: only our own user may toggle
+        self._server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_PASSCRED, 1)
+        try:
+            self._server_sock.bind(SOCKET_ADDR)
+        except OSError as e:
+            # Name squatted (or a stale holder despite the lock): run without --toggle
+            log.warning("Toggle socket unavailable, --toggle will not reach this instance: %s", e)
+            self._server_sock.close()
+            self._server_sock = None
+            return
+
+        # Plain fd source: no GIOChannel wrapper to allocate or keep alive
+        GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT,
             self._server_sock.fileno(),
-            GLib.IO_IN,
+            GLib.IOCondition.IN,
             self._on_socket_ready
         )
 
     def _on_socket_ready(self, fd, condition):
-        """Received socket connection"""
-        try:
-            conn, _ = self._server_sock.accept()
-            data = conn.recv(1024).decode("utf-8", errors="ignore")
-            conn.close()
-            if data == "toggle":
+        """Received toggle datagram(s): read everything pending in one dispatch"""
+        while True:
+            try:
+                # One datagram: the literal b"toggle", plus the sender's credentials
+                data, ancdata, _, _ = self._server_sock.recvmsg(8, CRED_BUFSIZE)
+            except BlockingIOError:
+                break
+            except Exception:
+                break
+            if data == b"toggle" and sender_uid(ancdata) == os.getuid():
                 GLib.idle_add(self.popup.toggle)
-        except Exception:
-            pass
         return True
 
+    # ── Paste Backend ─────────────────────────────────────────────
+
+    def _setup_paste_backend(self):
+        """Load the paste backend up front so the first paste doesn't pay for it"""
+        self._uinput = None  # Set by _init_uinput once the device is registered
+        self._xdotool = shutil.which("xdotool")  # Fallback paster, resolved once
+        self._xtest_ok = False  # Set by _init_xtest once XTest is usable
+        if is_wayland():
+            try:
+                from evdev import UInput, ecodes
+            except ImportError:
+                return  # evdev not installed, xdotool fallback
+            # Creating the device takes a kernel round-trip plus a settle delay
+            threading.Thread(target=self._init_uinput, args=(UInput, ecodes),
+                             daemon=True).start()
+        else:
+            # find_library may run ldconfig: resolve the libraries off the main thread
+            threading.Thread(target=self._load_xtest, daemon=True).start()
+
+    def _init_uinput(self, UInput, ecodes):
+        """Create the virtual Ctrl+V keyboard (runs in background thread)"""
+        try:
+            uinput = UInput(
+                {ecodes.EV_KEY: [ecodes.KEY_LEFTCTRL, ecodes.KEY_V]},
+                name='winvx-paste'
+            )
+            time.sleep(0.05)  # Wait for kernel to register device
+        except PermissionError:
+            print("[WinVX] ⚠ Insufficient permission for /dev/uinput")
+            print("[WinVX]   Please run: sudo usermod -aG input $USER")
+            return
+        except Exception as e:
+            print(f"[WinVX] evdev exception: {e}")
+            return
+        # Ctrl+V press and release as two SYN_REPORT frames, packed once
+        # (struct input_event: zero timeval = kernel timestamps it)
+        ev = struct.Struct("llHHi")
+        self._paste_events = b"".join(ev.pack(0, 0, t, c, v) for t, c, v in (
+            (ecodes.EV_KEY, ecodes.KEY_LEFTCTRL, 1),
+            (ecodes.EV_KEY, ecodes.KEY_V, 1),
+            (ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+            (ecodes.EV_KEY, ecodes.KEY_V, 0),
+            (ecodes.EV_KEY, ecodes.KEY_LEFTCTRL, 0),
+            (ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+        ))
+        self._uinput = uinput  # Publish last: the paste path only checks this
+
     # ── Callbacks ─────────────────────────────────────────────────
 
     def _on_clip_change(self, entry):
         """New clipboard content callback"""
-        GLib.idle_add(self.popup.refresh)
+        # Coalesce bursts of clipboard changes (multi-format updates, clipboard
+        # managers) into one popup refresh
+        if not self._refresh_timer:
+            self._refresh_timer = GLib.timeout_add(self.REFRESH_DELAY_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_timer = 0
+        self.popup.refresh()
+        return False
 
     def _on_paste(self, entry):
         """User clicked paste — Set content to clipboard"""
         self._pending_paste_entry = entry  # Save entry for _simulate_paste
         self.monitor.paste_entry(entry)     # Set clipboard (fallback)
-        # hide() is called in _on_item_click, simulate paste after focus returns to target window
-        # Wayland needs longer delay for WM to switch focus back to target app
-        delay = 200 if is_wayland() else 30
-        GLib.timeout_add(delay, self._simulate_paste)
+        # hide() is called in _on_item_click; once the popup loses focus
+        # (_on_popup_focus_out) the paste fires as soon as _target_focused() agrees.
+        # Until then the timer is a watchdog in case focus-out never arrives
+        self._paste_attempt = 0
+        self._arm_paste_timer(self.PASTE_CHECK_MS)
+
+    def _arm_paste_timer(self, delay):
+        if self._paste_timer:
+            GLib.source_remove(self._paste_timer)
+        self._paste_timer = GLib.timeout_add(delay, self._on_paste_timeout)
+
+    def _on_popup_focus_out(self, widget, event):
+        if self._paste_timer:
+            # Losing focus doesn't mean the target app has it yet: settle briefly, then
+            # _on_paste_timeout checks focus (backing off) before Ctrl+V is sent
+            self._arm_paste_timer(self.PASTE_SETTLE_MS)
+        return False  # Let the popup's own focus-out handler run
+
+    def _on_paste_timeout(self):
+        self._paste_timer = 0
+        self._paste_attempt += 1
+        if not self._target_focused() and self._paste_attempt < self.PASTE_MAX_CHECKS:
+            # Focus hasn't gone back to the target app yet (slow WM): wait longer
+            self._arm_paste_timer(self.PASTE_CHECK_MS << self._paste_attempt)
+            return False
+        return self._simulate_paste()
+
+    def _target_focused(self):
+        """Has input focus moved from the popup to another window (the paste target)?"""
+        if self._xtest_ok:
+            # X11: ask the server who has focus now
+            focus, revert = ctypes.c_ulong(0), ctypes.c_int(0)
+            self._XGetInputFocus(self._xtest_display, ctypes.byref(focus), ctypes.byref(revert))
+            window = self.popup.get_window()
+            popup_xid = window.get_xid() if hasattr(window, "get_xid") else 0
+            # None (0) / PointerRoot (1): the WM hasn't focused anything yet
+            return focus.value > 1 and focus.value != popup_xid
+        # Wayland: the compositor won't tell; the popup giving up focus is all we know
+        return not self.popup.is_active()
 
     def _simulate_paste(self):
         """Simulate paste"""
@@ -301,43 +464,17 @@ class WinVXApp:
     def _simulate_paste_wayland(self):
         """Wayland: Simulate Ctrl+V using python-evdev via uinput"""
         # Method 1: python-evdev (direct uinput, most reliable)
-        try:
-            from evdev import UInput, ecodes
-            import time as _time
-
-            # Cache UInput device to avoid repeated creation/destruction
-            if not hasattr(self, '_uinput'):
-                self._uinput = UInput(
-                    {ecodes.EV_KEY: [ecodes.KEY_LEFTCTRL, ecodes.KEY_V]},
-                    name='winvx-paste'
-                )
-                _time.sleep(0.05)  # Wait for kernel to register device
-
-            ui = self._uinput
-            ui.write(ecodes.EV_KEY, ecodes.KEY_LEFTCTRL, 1)
-            ui.write(ecodes.EV_KEY, ecodes.KEY_V, 1)
-            ui.syn()
-            _time.sleep(0.01)
-            ui.write(ecodes.EV_KEY, ecodes.KEY_V, 0)
-            ui.write(ecodes.EV_KEY, ecodes.KEY_LEFTCTRL, 0)
-            ui.syn()
-            return False  # Success
-        except ImportError:
-            pass  # evdev not installed
-        except PermissionError:
-            print("[WinVX] ⚠ Insufficient permission for /dev/uinput")
-            print("[WinVX]   Please run: sudo usermod -aG input $USER")
-        except Exception as e:
-            print(f"[WinVX] evdev exception: {e}")
+        uinput = self._uinput
+        if uinput is not None:
+            try:
+                # One write(2) delivers the whole key sequence
+                os.write(uinput.fd, self._paste_events)
+                return False  # Success
+            except Exception as e:
+                print(f"[WinVX] evdev exception: {e}")
 
         # Method 2: xdotool (via XWayland, only works for X11 apps)
-        try:
-            subprocess.run(
-                ["xdotool", "key", "--clearmodifiers", "--delay", "0", "ctrl+v"],
-                capture_output=True, timeout=3
-            )
-        except Exception:
-            pass
+        self._spawn_xdotool("key", "--clearmodifiers", "--delay", "0", "ctrl+v")
 
         if not getattr(self, '_paste_warned', False):
             self._paste_warned = True
@@ -347,59 +484,96 @@ class WinVXApp:
 
     def _simulate_paste_x11(self):
         """X11: Use XTest to send Ctrl+V key events directly (zero delay, no proc overhead)"""
-        try:
-            if not hasattr(self, '_xtst'):
-                self._init_xtest()
-
-            d = self._xtest_display
-            # Ctrl press → v press → v release → Ctrl release
-            self._xtst.XTestFakeKeyEvent(d, self._ctrl_keycode, True, 0)
-            self._xtst.XTestFakeKeyEvent(d, self._v_keycode, True, 0)
-            self._xtst.XTestFakeKeyEvent(d, self._v_keycode, False, 0)
-            self._xtst.XTestFakeKeyEvent(d, self._ctrl_keycode, False, 0)
-            self._xlib_paste.XFlush(d)
-        except Exception as e:
-            # fallback: xdotool
-            print(f"[WinVX] XTest failed, falling back to xdotool: {e}")
+        if self._xtest_ok:
             try:
-                subprocess.Popen(
-                    ["xdotool", "key", "--delay", "0", "ctrl+v"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-            except Exception:
-                pass
+                d, fake_key = self._xtest_display, self._XTestFakeKeyEvent
+                ctrl, v = self._ctrl_keycode, self._v_keycode
+                # Ctrl press → v press → v release → Ctrl release
+                fake_key(d, ctrl, True, 0)
+                fake_key(d, v, True, 0)
+                fake_key(d, v, False, 0)
+                fake_key(d, ctrl, False, 0)
+                self._XFlush(d)
+                return False
+            except (ctypes.ArgumentError, OSError) as e:
+                print(f"[WinVX] XTest failed, falling back to xdotool: {e}")
+
+        # fallback: xdotool
+        self._spawn_xdotool("key", "--delay", "0", "ctrl+v")
         return False
 
-    def _init_xtest(self):
-        """Initialize XTest extension (called only once)"""
-        import ctypes, ctypes.util
-
-        x11_path = ctypes.util.find_library("X11")
-        xtst_path = ctypes.util.find_library("Xtst")
-
-        self._xlib_paste = ctypes.cdll.LoadLibrary(x11_path)
-        self._xtst = ctypes.cdll.LoadLibrary(xtst_path)
-
-        # Set function signatures
-        self._xlib_paste.XOpenDisplay.restype = ctypes.c_void_p
-        self._xlib_paste.XKeysymToKeycode.restype = ctypes.c_int
-        self._xlib_paste.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
-        self._xlib_paste.XFlush.argtypes = [ctypes.c_void_p]
-
-        self._xtst.XTestFakeKeyEvent.argtypes = [
-            ctypes.c_void_p,  # display
-            ctypes.c_uint,    # keycode
-            ctypes.c_int,     # is_press (True/False)
-            ctypes.c_ulong,   # delay
-        ]
-        self._xtst.XTestFakeKeyEvent.restype = ctypes.c_int
+    def _spawn_xdotool(self, *args):
+        """Run xdotool fire-and-forget: posix_spawn (vfork fast path), no pipes, no wait"""
+        if not self._xdotool:
+            return
+        try:
+            pid = os.posix_spawn(self._xdotool, ["xdotool", *args], os.environ,
+                                 file_actions=_DEVNULL_STDOUT_STDERR)
+        except OSError:
+            return
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, lambda *a: None)  # Reap it
+
+    def _load_xtest(self):
+        """Load libXtst (plus libX11/libgdk-3 without a hotkey listener) — background thread"""
+        try:
+            xtst_path = ctypes.util.find_library("Xtst")
+            if not xtst_path:
+                raise RuntimeError("libXtst not found")
+            xtst = ctypes.cdll.LoadLibrary(xtst_path)
+            xtst.XTestFakeKeyEvent.argtypes = [
+                ctypes.c_void_p,  # display
+                ctypes.c_uint,    # keycode
+                ctypes.c_int,     # is_press (True/False)
+                ctypes.c_ulong,   # delay
+            ]
+            xtst.XTestFakeKeyEvent.restype = ctypes.c_int
+
+            xlib = gdk = None
+            listener = self._hotkey_listener
+            if listener is None or not listener.display:
+                x11_path = ctypes.util.find_library("X11")
+                xlib = ctypes.cdll.LoadLibrary(x11_path)
+                gdk = ctypes.cdll.LoadLibrary(ctypes.util.find_library("gdk-3"))
+                gdk.gdk_x11_get_default_xdisplay.restype = ctypes.c_void_p
+
+                # Set function signatures
+                xlib.XKeysymToKeycode.restype = ctypes.c_int
+                xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+                xlib.XFlush.argtypes = [ctypes.c_void_p]
+        except Exception as e:
+            print(f"[WinVX] ⚠ XTest initialization failed: {e}")
+            return
+        # GDK's display is only used from the main thread
+        GLib.idle_add(self._init_xtest, xtst, xlib, gdk)
 
-        self._xtest_display = self._xlib_paste.XOpenDisplay(None)
-        self._ctrl_keycode = self._xlib_paste.XKeysymToKeycode(
-            self._xtest_display, 0xffe3)  # XK_Control_L
-        self._v_keycode = self._xlib_paste.XKeysymToKeycode(
-            self._xtest_display, 0x0076)  # XK_v
+    def _init_xtest(self, xtst, xlib, gdk):
+        """Bind XTest to a display and resolve the Ctrl/V keycodes (main thread)"""
+        try:
+            listener = self._hotkey_listener
+            if xlib is None:
+                # Reuse the hotkey listener's (GDK's) connection
+                self._xlib_paste = listener.xlib
+                self._xtest_display = listener.display
+                self._ctrl_keycode = listener.keycode(XK_Control_L)
+                self._v_keycode = listener.keycode(XK_v)
+            else:
+                self._xlib_paste = xlib
+                self._xtest_display = gdk.gdk_x11_get_default_xdisplay()  # GTK's own connection
+                if not self._xtest_display:
+                    raise RuntimeError("No X display")
+                self._ctrl_keycode = xlib.XKeysymToKeycode(self._xtest_display, XK_Control_L)
+                self._v_keycode = xlib.XKeysymToKeycode(self._xtest_display, XK_v)
+
+            self._XTestFakeKeyEvent = xtst.XTestFakeKeyEvent
+            self._XFlush = self._xlib_paste.XFlush
+            self._XGetInputFocus = self._xlib_paste.XGetInputFocus
+            self._XGetInputFocus.argtypes = [
+                ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int)
+            ]
+            self._xtest_ok = bool(self._ctrl_keycode and self._v_keycode)
+        except Exception as e:
+            print(f"[WinVX] ⚠ XTest initialization failed: {e}")
+        return False
 
     # ── Run ───────────────────────────────────────────────────
 
@@ -407,13 +581,13 @@ class WinVXApp:
         session = get_session_type()
         print(f"[WinVX] 🚀 Clipboard Manager Started ({session} session)")
         print("[WinVX] Press Super+V to open clipboard history")
-        print(f"[WinVX] Or run: python3 {os.path.abspath(__file__)} --toggle")
+        print(f"[WinVX] Or run: python3 {MAIN_PATH} --toggle")
         if is_wayland():
             if not has_ydotool():
                 print("[WinVX] ⚠ ydotool not installed, paste function will be unavailable")
                 print("[WinVX]   Please install: sudo apt install ydotool")
 
-        signal.signal(signal.SIGINT, lambda *a: self.quit())
+        # SIGINT is dispatched by the GLib main loop only; a Python handler too would quit twice
         signal.signal(signal.SIGTERM, lambda *a: self.quit())
         GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT,
                              lambda: self.quit() or True)
@@ -424,13 +598,15 @@ class WinVXApp:
             self.quit()
 
     def quit(self):
+        if self._quitting:
+            return
+        self._quitting = True
         print("\n[WinVX] Exiting...")
         if self._hotkey_listener:
             self._hotkey_listener.stop()
         if hasattr(self, 'monitor'):
             self.monitor.stop()
-        if os.path.exists(SOCKET_PATH):
-            os.unlink(SOCKET_PATH)
+        self.store.flush()
         Gtk.main_quit()
 
 
@@ -438,44 +614,33 @@ class WinVXApp:
 
 def auto_bind_shortcut():
     """Try auto-registering Super+V hotkey to GNOME/KDE"""
-    me = os.path.abspath(os.path.join(os.path.dirname(__file__), "main.py"))
-    toggle_cmd = f"python3 {me} --toggle"
-    desktop = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+    toggle_cmd = f"python3 {MAIN_PATH} --toggle"
+    desktop = DESKTOP
 
     if "gnome" in desktop or "ubuntu" in desktop or "unity" in desktop:
-        # GNOME: Use gsettings for custom hotkey
+        # GNOME: Write the custom hotkey through GSettings (no gsettings subprocesses)
         try:
-            # Read existing custom keybindings
-            result = subprocess.run(
-                ["gsettings", "get", "org.gnome.settings-daemon.plugins.media-keys",
-                 "custom-keybindings"],
-                capture_output=True, text=True
-            )
-            existing = result.stdout.strip()
+            schema_id = "org.gnome.settings-daemon.plugins.media-keys"
+            source = Gio.SettingsSchemaSource.get_default()
+            # Gio.Settings.new() aborts the process on an unknown schema, so check first
+            if source is None or source.lookup(schema_id, True) is None:
+                raise RuntimeError(f"schema {schema_id} not installed")
 
             path = "/org/gnome/settings-daemon/plugins/media-keys/custom-keybindings/winvx/"
+            media_keys = Gio.Settings.new(schema_id)
+            paths = media_keys.get_strv("custom-keybindings")
 
             # Check if already registered
-            if "winvx" in existing:
+            if path in paths:
                 print("[WinVX] Hotkey already registered, updating...")
             else:
-                # Add to list
-                if existing == "@as []" or existing == "[]":
-                    new_list = f"['{path}']"
-                else:
-                    new_list = existing.rstrip("]") + f", '{path}']"
-                subprocess.run([
-                    "gsettings", "set",
-                    "org.gnome.settings-daemon.plugins.media-keys",
-                    "custom-keybindings", new_list
-                ], check=True)
-
-            # Set hotkey properties
-            base = "org.gnome.settings-daemon.plugins.media-keys.custom-keybinding"
-            schema_path = path
-            subprocess.run(["gsettings", "set", f"{base}:{schema_path}", "name", "WinVX Clipboard"], check=True)
-            subprocess.run(["gsettings", "set", f"{base}:{schema_path}", "command", toggle_cmd], check=True)
-            subprocess.run(["gsettings", "set", f"{base}:{schema_path}", "binding", "<Super>v"], check=True)
+                media_keys.set_strv("custom-keybindings", paths + [path])
+
+            binding = Gio.Settings.new_with_path(f"{schema_id}.custom-keybinding", path)
+            binding.set_string("name", "WinVX Clipboard")
+            binding.set_string("command", toggle_cmd)
+            binding.set_string("binding", "<Super>v")
+            Gio.Settings.sync()  # --bind exits right after: flush the writes to dconf
 
             print("[WinVX] ✓ Registered GNOME Hotkey: Super+V")
             print(f"[WinVX]   Command: {toggle_cmd}")
@@ -527,19 +692,21 @@ def main():
         auto_bind_shortcut()
         sys.exit(0)
 
-    # --toggle: Send signal to running instance
-    if args.toggle:
-        if send_toggle():
-            sys.exit(0)
-        else:
-            print("[WinVX] No instance running, starting...")
-
-    # Check for single instance
+    # Check for single instance (one flock; connect only if someone holds it)
     if is_running():
-        print("[WinVX] Already running, sending toggle signal")
+        if not args.toggle:
+            print("[WinVX] Already running, sending toggle signal")
         send_toggle()
         sys.exit(0)
 
+    # --toggle without a running instance: start one
+    if args.toggle:
+        print("[WinVX] No instance running, starting...")
+
+    # Diagnostics go through the "winvx" logger; WINVX_DEBUG enables debug output
+    logging.basicConfig(format="[WinVX] %(message)s",
+                        level=logging.DEBUG if os.environ.get("WINVX_DEBUG") else logging.INFO)
+
     app = WinVXApp(max_items=args.max)
     app.run()
 
@@ -5,10 +5,10 @@ Detect whether running in X11 or Wayland session
 
 import os
 import shutil
+from functools import lru_cache
 
 
-def get_session_type() -> str:
-    """Returns current session type: 'wayland' / 'x11' / 'unknown'"""
+def _detect_session_type() -> str:
     session = os.environ.get("XDG_SESSION_TYPE", "").lower()
     if session in ("wayland", "x11"):
         return session
@@ -20,19 +20,30 @@ def get_session_type() -> str:
     return "unknown"
 
 
+# The session does not change while we run: detect once at import
+_SESSION_TYPE = _detect_session_type()
+
+
+def get_session_type() -> str:
+    """Returns current session type: 'wayland' / 'x11' / 'unknown'"""
+    return _SESSION_TYPE
+
+
 def is_wayland() -> bool:
-    return get_session_type() == "wayland"
+    return _SESSION_TYPE == "wayland"
 
 
 def is_x11() -> bool:
-    return get_session_type() == "x11"
+    return _SESSION_TYPE == "x11"
 
 
+@lru_cache(maxsize=None)
 def has_ydotool() -> bool:
     """Check if ydotool is available (simulating key presses under Wayland)"""
     return shutil.which("ydotool") is not None
 
 
+@lru_cache(maxsize=None)
 def has_wl_paste() -> bool:
     """Check if wl-paste is available"""
     return shutil.which("wl-paste") is not None
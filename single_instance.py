@@ -0,0 +1,67 @@
+"""
+single_instance.py — Single Instance Control
+Instance lock and the toggle message to a running instance
+(kept free of GTK imports: main.py's --toggle fast path uses it before loading gi)
+"""
+
+import os
+import fcntl
+import socket
+import struct
+from typing import Optional
+
+# Abstract namespace socket (leading NUL): no file on disk, freed when the process exits.
+# The uid only keeps names apart: abstract sockets have no access control, so any local
+# user can send to it — the server checks each sender's credentials (sender_uid)
+SOCKET_ADDR = f"\0winvx-{os.getuid()}"
+
+_UCRED = struct.Struct("3i")  # struct ucred: pid, uid, gid
+CRED_BUFSIZE = socket.CMSG_SPACE(_UCRED.size)
+
+# Per-user lock: $XDG_RUNTIME_DIR is private to the user; /tmp needs the uid suffix
+_runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+LOCK_PATH = (os.path.join(_runtime_dir, "winvx.lock") if _runtime_dir
+             else f"/tmp/winvx-{os.getuid()}.lock")
+
+_lock_fd = None  # Held for the lifetime of the running instance
+
+
+def is_running() -> bool:
+    """Check if an instance is already running
+
+    Takes a non-blocking flock on LOCK_PATH; if it is free, this process keeps
+    it and becomes the running instance.
+    """
+    global _lock_fd
+    if _lock_fd is not None:
+        return False
+    try:
+        fd = os.open(LOCK_PATH, os.O_RDONLY | os.O_CREAT, 0o644)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return True
+    _lock_fd = fd
+    return False
+
+
+def send_toggle():
+    """Send toggle signal to a running instance"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(0.2)  # A wedged instance must not hang the hotkey command
+            sock.sendto(b"toggle", SOCKET_ADDR)
+        return True
+    except OSError:
+        return False
+
+
+def sender_uid(ancdata) -> Optional[int]:
+    """uid of a datagram's sender, from SCM_CREDENTIALS (receiver needs SO_PASSCRED)"""
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_CREDENTIALS:
+            return _UCRED.unpack(data[:_UCRED.size])[1]
+    return None